@@ -11,7 +11,12 @@
 #---------------------------
 import tkinter as tk 
 import win32com.client
+import openpyxl
 import re
+import os
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 
 #---------------------------
 #          Variables
@@ -22,6 +27,15 @@ acceptable_color=5296274
 facultative_color=9881640
 negligible_color=12632256
 
+#Worker processes reading RXX worksheets from the saved file (1: read in this process).
+#Each worker re-opens the workbook, which costs about as much as reading 35 risk sheets: measured slower than 1 on a 99 risk sheets PSP
+extract_workers=1
+
+#Office constants used by fast mode (xlCalculationManual, xlMinimized, ppWindowMinimized)
+xl_calculation_manual=-4135
+xl_minimized=-4140
+ppt_minimized=2
+
 #Values from PSP templates for French/English 
 PSP_data={
     "worksheets":{
@@ -39,6 +53,27 @@ PSP_data={
     "ppt_prj_name":{
         "EN":"Project name",
         "FR":"Nom du projet"
+    },
+    #Anchor profiles: name of the shape identifying each slide to update in the ppt template
+    "ppt_anchors":{
+        "full":{
+            "risk_synth":"Title Risks",
+            "risk":"Title Risk",
+            "recos":"Title Recommendations",
+            "sm":"Title SecurityMeasures",
+            "intro":"NOMPROJET",
+            "context":"Title Context",
+            "classif":"Title Classification",
+            "execSum":"Title ExecSum"
+        },
+        "exec":{
+            "risk_synth":"Title Risks",
+            "recos":"Title Recommendations",
+            "intro":"NOMPROJET",
+            "context":"Title Context",
+            "classif":"Title Classification",
+            "execSum":"Title ExecSum"
+        }
     }
 }
 
@@ -152,6 +187,24 @@ class PresentationPPT:
     def add_slide_risk(self,slide):
         self.slide_risks.append(slide)
 
+'''
+* Class RenderTarget : ppt file to render from the extracted PSP (language of the template, slide anchors)
+* anchors default to the "full" profile of PSP_data["ppt_anchors"], slides without anchor or missing from the template are skipped
+* folder: where a relative ppt_filename is opened from if the presentation is not already open (usually the workbook folder)
+'''
+class RenderTarget:
+    def __init__(self,ppt_filename,language,anchors=None,folder=None):
+        self.ppt_filename=ppt_filename
+        self.language=language
+        self.folder=folder
+        if anchors is None:
+            anchors=PSP_data["ppt_anchors"]["full"]
+        #Own copy so a target can change its anchors without affecting the others
+        self.anchors=dict(anchors)
+
+    def __str__(self):
+        return f"{self.ppt_filename} ({self.language})"
+
 '''
 * Class ProjectPSP : object that project information (project name, project head, etc)
 '''
@@ -180,6 +233,58 @@ class ProjectPSP:
 #          Excel functions to get PSP information from Excel file
 #---------------------------
 
+#Cell value read from a saved workbook (same .Value attribute as COM cells)
+class FileCell:
+    def __init__(self,value):
+        self.Value=value
+
+#Worksheet read from a saved workbook, rows are parsed only up to the last one requested
+class FileWorksheet:
+    def __init__(self,ws):
+        self.ws=ws
+        self.Name=ws.title
+        self.rows=None
+        self.values=[]
+
+    def Cells(self,row,column):
+        if self.rows is None:
+            self.rows=self.ws.iter_rows(values_only=True)
+        while len(self.values)<row:
+            next_row=next(self.rows,None)
+            if next_row is None:
+                return FileCell(None)
+            self.values.append(next_row)
+        if column>len(self.values[row-1]):
+            return FileCell(None)
+        return FileCell(self.values[row-1][column-1])
+
+#Worksheets collection: iterable and callable by name like COM Worksheets
+class FileWorksheets:
+    def __init__(self,wb):
+        self.wb=wb
+
+    def __iter__(self):
+        return iter([FileWorksheet(ws) for ws in self.wb.worksheets])
+
+    def __call__(self,name):
+        return FileWorksheet(self.wb[name])
+
+'''
+* Class FileWorkbook : read-only view of a saved workbook (openpyxl) exposing the same Worksheets/Cells/Value
+* interface as the Excel COM objects, so extraction functions work on both.
+* Must be closed after use so Excel can save the file again.
+'''
+class FileWorkbook:
+    def __init__(self,xlfile):
+        #read_only: worksheets are parsed on demand instead of loading the whole workbook
+        #data_only: read values cached by Excel on save instead of formulas
+        self.xlfile=xlfile
+        self.wb=openpyxl.load_workbook(xlfile,read_only=True,data_only=True)
+        self.Worksheets=FileWorksheets(self.wb)
+
+    def close(self):
+        self.wb.close()
+
 #Open and return workbook object given filename
 def openWorkbook(xlapp, xlfile):
     try:        
@@ -213,38 +318,44 @@ def get_index(ws,lookup):
         end_tab+=1
     return start_tab+1,end_tab
 
-#Create reco_tab or sm_tab from risk worksheet
-def get_elems_from_RXX(ws_RXX,risk,elem_tab,is_reco,language):
+#Read (description, priority) rows of the reco or sm table from risk worksheet
+def read_elems_from_RXX(ws_RXX,is_reco,language):
     lookup=PSP_data["excel_reco_header"][language]
     if is_reco==False:
         lookup=PSP_data["excel_sm_header"][language]
-    
+
+    rows=[]
     start,stop=get_index(ws_RXX,lookup)
     for row in range(start,stop):
+        priority=None
+        if is_reco:
+            priority=ws_RXX.Cells(row,4).Value
+        rows.append((ws_RXX.Cells(row,3).Value,priority))
+    return rows
+
+#Add rows read from risk worksheet to reco_tab or sm_tab (dedup and ID assignment)
+def add_elems_from_RXX(rows,risk,elem_tab,is_reco):
+    for description,priority in rows:
         #Create new Element object
-        
-        new_elem=Element(ws_RXX.Cells(row,3).Value)
-        
+        new_elem=Element(description)
+
         #Check if element already exist
         is_new=check_new(new_elem,elem_tab,risk)
 
         if is_new==True:
-            
-            if is_reco: 
+
+            if is_reco:
                 #Create new recommendation object
                 reco_id="REC"+str(len(elem_tab)+1).zfill(2)
-                priority=ws_RXX.Cells(row,4).Value
                 new_reco=reco_from_elem(new_elem,priority,reco_id,risk)
-                
+
                 elem_tab.append(new_reco)
             else:
                 #Create SM object
                 sm_id="SM"+str(len(elem_tab)+1).zfill(2)
                 new_sm=sm_from_elem(new_elem,sm_id,risk)
-    
+
                 elem_tab.append(new_sm)
-                
-           
 
 """Given an instance of Element, return a new instance of Recommandation"""
 def reco_from_elem(elem,priority,reco_id,risk):
@@ -261,33 +372,60 @@ def sm_from_elem(elem,sm_id,risk):
     sm.add_associated_risk(risk)
     return sm
     
-""" Create risk_tab, reco_tab, sm_tab from RXX worksheets """
-def get_PSP_risks_inf(wb,reco_tab,sm_tab,risk_tab,language):
+""" Read risk, recommendations and security measures from one RXX worksheet """
+def read_RXX_sheet(ws,language):
+    #Get risk from RXX worksheet
+    risk=Risk(risk_id=str(ws.Name),
+        theme=ws.Cells(4,2).Value,
+        description=ws.Cells(4,3).Value,
+        ini_imp=ws.Cells(4,4).Value,
+        ini_pot=ws.Cells(4,5).Value,
+        ini_grav=str(ws.Cells(4,6).Value)[4:],
+        res_imp=ws.Cells(4,7).Value,
+        res_pot=ws.Cells(4,8).Value,
+        res_grav=str(ws.Cells(4,9).Value)[4:]
+        )
+    reco_rows=read_elems_from_RXX(ws,is_reco=True,language=language)
+    sm_rows=read_elems_from_RXX(ws,is_reco=False,language=language)
+    return risk,reco_rows,sm_rows
+
+""" Worker: open the saved workbook and read the given RXX worksheets, return plain (risk, reco_rows, sm_rows) data """
+def read_RXX_file_sheets(xlfile,sheet_names,language):
+    file_wb=FileWorkbook(xlfile)
+    try:
+        return [read_RXX_sheet(file_wb.Worksheets(name),language) for name in sheet_names]
+    finally:
+        file_wb.close()
+
+""" Create risk_tab, reco_tab, sm_tab from RXX worksheets
+    With a FileWorkbook and max_workers>1, worksheets are read in worker processes (COM objects can't be shared) """
+def get_PSP_risks_inf(wb,reco_tab,sm_tab,risk_tab,language,max_workers=1):
 
     #Browse RXX worksheets
-    for ws in wb.Worksheets:
-        if re.match("R\d{2}",ws.Name):
-            
-            #Get risk from RXX worksheet
-            risk=Risk(risk_id=str(ws.Name),
-                theme=ws.Cells(4,2).Value,
-                description=ws.Cells(4,3).Value,
-                ini_imp=ws.Cells(4,4).Value,
-                ini_pot=ws.Cells(4,5).Value,
-                ini_grav=str(ws.Cells(4,6).Value)[4:],
-                res_imp=ws.Cells(4,7).Value,
-                res_pot=ws.Cells(4,8).Value,
-                res_grav=str(ws.Cells(4,9).Value)[4:]
-                )
-            risk_tab.append(risk)
-            
-            #Get Recommendations from RXX worksheet
-            get_elems_from_RXX(ws,risk,reco_tab,is_reco=True,language=language)
-            
-
-            #Get Security Measures from RXX worksheet
-            get_elems_from_RXX(ws,risk,sm_tab,is_reco=False,language=language)
-            
+    sheets=[ws for ws in wb.Worksheets if re.match("R\d{2}",ws.Name)]
+
+    #[1] Read each RXX worksheet independently
+    if max_workers>1 and isinstance(wb,FileWorkbook) and len(sheets)>1:
+        #Contiguous shares of sheet names: concatenating results keeps workbook order
+        names=[ws.Name for ws in sheets]
+        nb_workers=min(max_workers,len(names))
+        size=-(-len(names)//nb_workers)
+        shares=[names[i:i+size] for i in range(0,len(names),size)]
+        with ProcessPoolExecutor(max_workers=len(shares)) as executor:
+            results=executor.map(read_RXX_file_sheets,[wb.xlfile]*len(shares),shares,[language]*len(shares))
+            sheets_inf=[sheet_inf for result in results for sheet_inf in result]
+    else:
+        sheets_inf=[read_RXX_sheet(ws,language) for ws in sheets]
+
+    #[2] Merge in workbook order so dedup and REC/SM IDs match a sequential read
+    for risk,reco_rows,sm_rows in sheets_inf:
+        risk_tab.append(risk)
+
+        #Get Recommendations from RXX worksheet
+        add_elems_from_RXX(reco_rows,risk,reco_tab,is_reco=True)
+
+        #Get Security Measures from RXX worksheet
+        add_elems_from_RXX(sm_rows,risk,sm_tab,is_reco=False)
 
     return reco_tab,sm_tab,risk_tab 
 
@@ -322,6 +460,51 @@ def get_additional_PSP_inf(wb,language):
     return project
 
 
+#---------------------------
+#          Office fast mode: suspend repaint, recalculation and events while writing
+#---------------------------
+
+""" Restore one application setting, a failure (e.g. Excel busy in cell edit mode) must not prevent restoring the others """
+def restore_setting(app,name,value):
+    try:
+        setattr(app,name,value)
+    except Exception as e:
+        print(f"Could not restore {name}: {e}")
+
+""" Excel fast mode: no screen updating, manual calculation, no events, minimised window (unless minimise is False).
+    Previous state restored on exit, even on error """
+@contextmanager
+def excel_fast_mode(xlapp,minimise=True):
+    screen_updating=xlapp.ScreenUpdating
+    calculation=xlapp.Calculation
+    enable_events=xlapp.EnableEvents
+    window_state=xlapp.WindowState
+    try:
+        xlapp.ScreenUpdating=False
+        xlapp.Calculation=xl_calculation_manual
+        xlapp.EnableEvents=False
+        if minimise:
+            xlapp.WindowState=xl_minimized
+        yield xlapp
+    finally:
+        if minimise:
+            restore_setting(xlapp,"WindowState",window_state)
+        restore_setting(xlapp,"EnableEvents",enable_events)
+        #Restoring automatic calculation recalculates the workbook once
+        restore_setting(xlapp,"Calculation",calculation)
+        restore_setting(xlapp,"ScreenUpdating",screen_updating)
+
+""" PowerPoint fast mode: minimised window so slides are not redrawn while duplicated and filled. Previous state restored on exit, even on error """
+@contextmanager
+def ppt_fast_mode(pptapp):
+    window_state=pptapp.WindowState
+    try:
+        pptapp.WindowState=ppt_minimized
+        yield pptapp
+    finally:
+        restore_setting(pptapp,"WindowState",window_state)
+
+
 #---------------------------
 #          Excel functions to write risks,security measures, recommendations on Excel file
 #---------------------------
@@ -401,6 +584,17 @@ def search_slide(slides,lookup):
             pass
     return is_found,None
 
+'''Search for all slides containing a particular shape'''
+def search_slides(slides,lookup):
+    found=[]
+    for slide in slides:
+        try:
+            slide.Shapes(lookup)
+            found.append(slide)
+        except:
+            pass
+    return found
+
 '''Change foreground color of a ppt table cell based on its value'''
 def set_color_cell(text,cell):
     if text=="Urgente" or text=="Urgent" or text=="Priority" or text=="Prioritaire":
@@ -451,13 +645,17 @@ def clean_table(shape):
         for cell in shape.Table.Rows(2).Cells:
             cell.Shape.TextFrame.TextRange.Text=""
 
-'''Clean all tables in RO1 slide (viewed as reference slide for risks)'''
+'''Clean all tables in RO1 slide (viewed as reference slide for risks) and synthesis slides found in the template'''
 def clean_RO1_slide(pres):
-    clean_table(pres.slide_risks[0].Shapes("Recommendations"))
-    clean_table(pres.slide_risks[0].Shapes("SecurityMeasures"))
-    clean_table(pres.slide_risk_synth.Shapes("Risks"))
-    clean_table(pres.slide_recos.Shapes("Recommendations"))
-    clean_table(pres.slide_sm.Shapes("SecurityMeasures"))
+    if len(pres.slide_risks)>0:
+        clean_table(pres.slide_risks[0].Shapes("Recommendations"))
+        clean_table(pres.slide_risks[0].Shapes("SecurityMeasures"))
+    if pres.slide_risk_synth is not None:
+        clean_table(pres.slide_risk_synth.Shapes("Risks"))
+    if pres.slide_recos is not None:
+        clean_table(pres.slide_recos.Shapes("Recommendations"))
+    if pres.slide_sm is not None:
+        clean_table(pres.slide_sm.Shapes("SecurityMeasures"))
 
 '''Write risk, associated security measures and recommendations on slide RXX'''
 def update_RXX_slide(slide_risk,risk,reco_tab,sm_tab):
@@ -548,92 +746,288 @@ def get_textFrame(shape):
     return shape.TextFrame.TextRange
 
 """Write additional information (project name, context, exec sum, etc) based on ProjectPSP"""
-def update_addit_inf_slides(pres,project_inf,language):
+def update_addit_inf_slides(pres,project_inf,language,anchors):
     
-    #Update project name
-    shape=pres.slide_intro.Shapes("NOMPROJET")
-    get_textFrame(shape).Text=re.sub("(?:\[{}\])".format(PSP_data["ppt_prj_name"][language]), project_inf.name,get_textFrame(shape).Text)
-    shape=pres.slide_context.Shapes("PRJ NAME")
-    get_textFrame(shape).Text=project_inf.name
-    
-    #Update project head and division
-    shape=pres.slide_intro.Shapes("CPI")
-    get_textFrame(shape).Text=re.sub('(?:\<CPI\>)', project_inf.head,get_textFrame(shape).Text)
-    get_textFrame(shape).Text=re.sub('(?:\<Division\>)', project_inf.division,get_textFrame(shape).Text)
-
-    #Update Context
-    shape=pres.slide_context.Shapes("CONTEXT")
-    get_shape_item(shape,row=2,column=1).Text=project_inf.context
-
-    #Update Hypothesis
-    shape=pres.slide_classif.Shapes("Assumptions")
-    get_textFrame(shape).Text=project_inf.hypothesis
-
-    #Update DICP
-    shape=pres.slide_classif.Shapes("DICP")
-    get_shape_item(shape,row=2,column=1).Text=project_inf.availability
-    get_shape_item(shape,row=2,column=2).Text=project_inf.integrity
-    get_shape_item(shape,row=2,column=3).Text=project_inf.confidentiality
-    get_shape_item(shape,row=2,column=4).Text=project_inf.proof
-
-    #Update RTO/RPO
-    shape=pres.slide_classif.Shapes("RTO RPO")
-    get_shape_item(shape,row=2,column=1).Text=project_inf.rto
-    get_shape_item(shape,row=2,column=2).Text=project_inf.rpo
-
-    #Update Exec Sum
-    shape=pres.slide_execSum.Shapes("Summary")
-    get_textFrame(shape).Text=project_inf.summary
-    shape=pres.slide_execSum.Shapes("Decision")
-    get_textFrame(shape).Text=project_inf.decision
+    if pres.slide_intro is not None:
+        #Update project name
+        shape=pres.slide_intro.Shapes(anchors["intro"])
+        get_textFrame(shape).Text=re.sub("(?:\[{}\])".format(PSP_data["ppt_prj_name"][language]), project_inf.name,get_textFrame(shape).Text)
+
+        #Update project head and division
+        shape=pres.slide_intro.Shapes("CPI")
+        get_textFrame(shape).Text=re.sub('(?:\<CPI\>)', project_inf.head,get_textFrame(shape).Text)
+        get_textFrame(shape).Text=re.sub('(?:\<Division\>)', project_inf.division,get_textFrame(shape).Text)
+
+    if pres.slide_context is not None:
+        shape=pres.slide_context.Shapes("PRJ NAME")
+        get_textFrame(shape).Text=project_inf.name
+
+        #Update Context
+        shape=pres.slide_context.Shapes("CONTEXT")
+        get_shape_item(shape,row=2,column=1).Text=project_inf.context
+
+    if pres.slide_classif is not None:
+        #Update Hypothesis
+        shape=pres.slide_classif.Shapes("Assumptions")
+        get_textFrame(shape).Text=project_inf.hypothesis
+
+        #Update DICP
+        shape=pres.slide_classif.Shapes("DICP")
+        get_shape_item(shape,row=2,column=1).Text=project_inf.availability
+        get_shape_item(shape,row=2,column=2).Text=project_inf.integrity
+        get_shape_item(shape,row=2,column=3).Text=project_inf.confidentiality
+        get_shape_item(shape,row=2,column=4).Text=project_inf.proof
+
+        #Update RTO/RPO
+        shape=pres.slide_classif.Shapes("RTO RPO")
+        get_shape_item(shape,row=2,column=1).Text=project_inf.rto
+        get_shape_item(shape,row=2,column=2).Text=project_inf.rpo
+
+    if pres.slide_execSum is not None:
+        #Update Exec Sum
+        shape=pres.slide_execSum.Shapes("Summary")
+        get_textFrame(shape).Text=project_inf.summary
+        shape=pres.slide_execSum.Shapes("Decision")
+        get_textFrame(shape).Text=project_inf.decision
+
+"""Search for the slide of an anchor, None if the anchor is not part of the profile or not found"""
+def search_anchor_slide(slides,anchors,key):
+    if key not in anchors:
+        return None
+    is_found,slide=search_slide(slides=slides,lookup=anchors[key])
+    return slide
+
+"""Open and return presentation object given filename, a relative filename is opened from folder (default: current directory)"""
+def openPresentation(pptapp,pptfile,folder=None):
+    try:
+        pptpres=pptapp.Presentations(pptfile)
+    except Exception:
+        if folder is not None and not os.path.isabs(pptfile):
+            pptfile=os.path.join(folder,pptfile)
+        pptpres=pptapp.Presentations.Open(os.path.abspath(pptfile))
+    return pptpres
 
 """Global function to update ppt with risks, security measures, recommendations and additional project information"""
-def update_ppt_file(reco_tab,sm_tab,risk_tab,project_inf,ppt_filename,language):
+def update_ppt_file(reco_tab,sm_tab,risk_tab,project_inf,ppt_filename,language,anchors=None,folder=None):
+    if anchors is None:
+        anchors=PSP_data["ppt_anchors"]["full"]
     #get ppt instance
     PPTApp = win32com.client.GetActiveObject("PowerPoint.Application")
     #get ref to the presentation powerpoint object
-    PPTPres=PPTApp.Presentations(ppt_filename)
+    PPTPres=openPresentation(PPTApp,ppt_filename,folder)
     
     #[1] Find slides in presentation
-    is_found,slide_risk_synth=search_slide(slides=PPTPres.Slides,lookup="Title Risks")
-    is_found,slide_R01=search_slide(slides=PPTPres.Slides,lookup="Title Risk")
-    is_found,slide_recos=search_slide(slides=PPTPres.Slides,lookup="Title Recommendations")
-    is_found,slide_sm=search_slide(slides=PPTPres.Slides,lookup="Title SecurityMeasures")
+    slide_risk_synth=search_anchor_slide(PPTPres.Slides,anchors,"risk_synth")
+    slide_R01=search_anchor_slide(PPTPres.Slides,anchors,"risk")
+    slide_recos=search_anchor_slide(PPTPres.Slides,anchors,"recos")
+    slide_sm=search_anchor_slide(PPTPres.Slides,anchors,"sm")
 
     #[2] Find additional slides (introduction, context, classification,exec sum)
-    is_found,slide_intro=search_slide(slides=PPTPres.Slides,lookup="NOMPROJET")
-    is_found,slide_context=search_slide(slides=PPTPres.Slides,lookup="Title Context")
-    is_found,slide_classif=search_slide(slides=PPTPres.Slides,lookup="Title Classification")
-    is_found,slide_execSum=search_slide(slides=PPTPres.Slides,lookup="Title ExecSum")
+    slide_intro=search_anchor_slide(PPTPres.Slides,anchors,"intro")
+    slide_context=search_anchor_slide(PPTPres.Slides,anchors,"context")
+    slide_classif=search_anchor_slide(PPTPres.Slides,anchors,"classif")
+    slide_execSum=search_anchor_slide(PPTPres.Slides,anchors,"execSum")
 
     pres=PresentationPPT(slide_risk_synth,slide_recos,slide_sm,slide_intro,slide_context,slide_classif,slide_execSum)
-    pres.add_slide_risk(slide_R01)
+    if slide_R01 is not None:
+        pres.add_slide_risk(slide_R01)
     
-    #[3] Clean tables in RO1 slide
+    #[3] Remove risk slides duplicated by a previous run and clean tables in RO1 slide
+    if slide_R01 is not None:
+        for slide in search_slides(slides=PPTPres.Slides,lookup=anchors["risk"])[1:]:
+            slide.Delete()
     clean_RO1_slide(pres)
     
-    #[4] Duplicate Slide R01 risk template and append new risk slides in the slide risk tab
-    for i in range(len(risk_tab)-1):
-        new_slide_risk=pres.slide_risks[i].Duplicate()
-        pres.add_slide_risk(new_slide_risk)
-    
-    #[5] Update slides RXX
-    for index,risk in enumerate(risk_tab):
-        slide_risk=pres.slide_risks[index]
-        update_RXX_slide(slide_risk,risk,reco_tab,sm_tab)
+    if slide_R01 is not None:
+        #[4] Duplicate Slide R01 risk template and append new risk slides in the slide risk tab
+        for i in range(len(risk_tab)-1):
+            new_slide_risk=pres.slide_risks[i].Duplicate()
+            pres.add_slide_risk(new_slide_risk)
+
+        #[5] Update slides RXX
+        for index,risk in enumerate(risk_tab):
+            slide_risk=pres.slide_risks[index]
+            update_RXX_slide(slide_risk,risk,reco_tab,sm_tab)
     
     #[6] Update risks synthesis slide
-    update_risks_synth_slide(pres, risk_tab)
+    if slide_risk_synth is not None:
+        update_risks_synth_slide(pres, risk_tab)
         
     #[7] Update recommendations synthesis slide
-    update_recos_synth_slide(pres,reco_tab)
+    if slide_recos is not None:
+        update_recos_synth_slide(pres,reco_tab)
     
     #[8] Update SM synthesis slide
-    update_sm_synth_slide(pres,sm_tab)
+    if slide_sm is not None:
+        update_sm_synth_slide(pres,sm_tab)
     
     #[9] Update additional slides
-    update_addit_inf_slides(pres,project_inf,language)
+    update_addit_inf_slides(pres,project_inf,language,anchors)
+
+"""Render every target from one extraction, one after another: PowerPoint handles COM calls on a single thread,
+   so rendering decks in parallel would only queue (or reject) calls. Raise if any target failed, after trying all of them
+   PowerPoint fast mode is set once here: the application window is shared by all targets """
+def render_targets(targets,reco_tab,sm_tab,risk_tab,project_inf):
+    failed=[]
+    PPTApp = win32com.client.GetActiveObject("PowerPoint.Application")
+    with ppt_fast_mode(PPTApp):
+        for target in targets:
+            try:
+                update_ppt_file(reco_tab,sm_tab,risk_tab,project_inf,ppt_filename=target.ppt_filename,language=target.language,anchors=target.anchors,folder=target.folder)
+                print(f"{target} updated")
+            except Exception as e:
+                print(f"{target} failed: {e}")
+                failed.append(str(target))
+    if len(failed)>0:
+        raise RuntimeError("ppt update failed for "+", ".join(failed))
+
+"""Build render targets from ppt filename input: "deck.pptx; deck_en.pptx=EN; exec.pptx=FR,exec"
+   options after "=" are a language and/or an anchor profile (default: selected language, "full" profile) """
+def parse_targets(text,language,folder=None):
+    targets=[]
+    ppt_files=[]
+    for item in text.split(";"):
+        item=item.strip()
+        if item=="":
+            continue
+        ppt_file,sep,options=item.rpartition("=")
+        if sep=="":
+            ppt_file,options=item,[]
+        else:
+            options=[option.strip() for option in options.split(",")]
+        ppt_file=ppt_file.strip()
+        for option in options:
+            if option not in PSP_data["ppt_prj_name"] and option not in PSP_data["ppt_anchors"]:
+                raise ValueError(f"{ppt_file}: unknown option '{option}', expected a language ({'/'.join(PSP_data['ppt_prj_name'])}) or an anchor profile ({'/'.join(PSP_data['ppt_anchors'])})")
+
+        #Two targets writing the same presentation would overwrite each other
+        if os.path.normcase(ppt_file) in ppt_files:
+            raise ValueError(f"{ppt_file} is listed more than once")
+        ppt_files.append(os.path.normcase(ppt_file))
+
+        target_language=language
+        anchors=PSP_data["ppt_anchors"]["full"]
+        for option in options:
+            if option in PSP_data["ppt_prj_name"]:
+                target_language=option
+            else:
+                anchors=PSP_data["ppt_anchors"][option]
+        targets.append(RenderTarget(ppt_file,target_language,anchors,folder))
+    return targets
+
+
+
+#---------------------------
+#          Watch mode functions to regenerate outputs when the workbook is saved
+#---------------------------
+
+#Delay without new save before outputs are regenerated (a save can touch the file several times)
+watch_debounce=1.5
+#Interval between two checks of the workbook modification time
+watch_poll_ms=500
+
+"""Return a comparable snapshot of risks, security measures and recommendations"""
+def get_model_signature(reco_tab,sm_tab,risk_tab):
+    return (tuple(tuple(vars(risk).values()) for risk in risk_tab),
+        tuple((str(reco),reco.get_associated_risk()) for reco in reco_tab),
+        tuple((str(sm),sm.get_associated_risk()) for sm in sm_tab))
+
+'''
+* Class WorkbookWatcher : poll a saved workbook and, once a burst of saves is over, re-run only the stages whose inputs changed
+* (Excel synthesis sheets when risks/recos/sm changed, deck when risks/recos/sm or project information changed)
+'''
+class WorkbookWatcher:
+    def __init__(self,xl_fullname,xl_name,ppt_filename,language,update_excel,update_ppt):
+        self.xl_fullname=xl_fullname
+        self.xl_name=xl_name
+        self.ppt_filename=ppt_filename
+        self.language=language
+        self.update_excel=update_excel
+        self.update_ppt=update_ppt
+        self.last_mtime=os.path.getmtime(xl_fullname)
+        self.changed_at=None
+        self.last_change=None
+        #Signature of the inputs last written successfully to each output
+        self.excel_signature=None
+        self.ppt_signature=None
+
+    #Check workbook modification time, return True when outputs were regenerated
+    def poll(self):
+        try:
+            mtime=os.path.getmtime(self.xl_fullname)
+        except OSError:
+            #Excel saves through a temporary file: workbook can be briefly missing while it is replaced
+            mtime=None
+        if mtime is None or mtime!=self.last_mtime:
+            #Restart debounce on each save of the burst
+            self.last_mtime=mtime
+            if self.changed_at is None:
+                self.changed_at=time.time()
+            self.last_change=time.time()
+            return False
+        if self.changed_at is not None and time.time()-self.last_change>=watch_debounce:
+            changed_at=self.changed_at
+            self.changed_at=None
+            if self.run():
+                print(f"Outputs updated {time.time()-changed_at:.1f}s after save")
+            return True
+        return False
+
+    #Extract from saved workbook and write outputs whose inputs changed, return False if an output could not be written
+    def run(self):
+        risk_tab=[]
+        reco_tab=[]
+        sm_tab=[]
+
+        try:
+            file_wb=FileWorkbook(self.xl_fullname)
+            try:
+                get_PSP_risks_inf(file_wb,reco_tab,sm_tab,risk_tab,self.language,max_workers=extract_workers)
+                project_inf=get_additional_PSP_inf(file_wb,self.language)
+            finally:
+                file_wb.close()
+        except Exception as e:
+            #Workbook may be read while Excel is still writing it: wait for next save
+            print(e)
+            return False
 
+        #Excel synthesis sheets only depend on risks/recos/sm, the deck also on project information
+        excel_signature=get_model_signature(reco_tab,sm_tab,risk_tab)
+        ppt_signature=(excel_signature,tuple(vars(project_inf).values()))
+        update_excel=self.update_excel and excel_signature!=self.excel_signature
+        update_ppt=self.update_ppt and ppt_signature!=self.ppt_signature
+        is_written=True
+
+        if update_excel:
+            try:
+                excel = win32com.client.gencache.EnsureDispatch('Excel.Application')
+                wb = openWorkbook(excel, self.xl_name)
+                #Analyst is working in Excel: do not minimise the window on each save
+                with excel_fast_mode(excel,minimise=False):
+                    update_excel_file(wb,reco_tab,sm_tab,risk_tab,self.language)
+                #Only remember inputs once written, so a failed write is retried on next save
+                self.excel_signature=excel_signature
+            except Exception as e:
+                print(e)
+                is_written=False
+            finally:
+                # RELEASES RESOURCES
+                wb = None
+                excel = None
+
+        if update_ppt:
+            try:
+                targets=parse_targets(self.ppt_filename,self.language,folder=os.path.dirname(self.xl_fullname))
+                render_targets(targets,reco_tab,sm_tab,risk_tab,project_inf)
+                self.ppt_signature=ppt_signature
+            except Exception as e:
+                print(e)
+                is_written=False
+
+        if not (update_excel or update_ppt):
+            print("No change in risks or project information, outputs left as is")
+
+        return is_written
 
 
 #---------------------------
@@ -649,6 +1043,8 @@ def controller():
     reco_tab=[]
     sm_tab=[]
     project_inf=None
+    #Decks given without path are opened from the workbook folder
+    xl_folder=None
 
     language=language_button.config('text')[-1]
 
@@ -660,13 +1056,26 @@ def controller():
         excel = win32com.client.gencache.EnsureDispatch('Excel.Application')
         wb = openWorkbook(excel, excel_filename.get())
         excel.Visible = True
+        xl_folder=wb.Path
         
-        get_PSP_risks_inf(wb,reco_tab,sm_tab,risk_tab,language)
-        project_inf=get_additional_PSP_inf(wb,language)
+        if action_fastRead.get() and wb.Saved:
+            #Read the saved file instead of the COM workbook (no cross-process call per cell)
+            file_wb=FileWorkbook(wb.FullName)
+            try:
+                get_PSP_risks_inf(file_wb,reco_tab,sm_tab,risk_tab,language,max_workers=extract_workers)
+                project_inf=get_additional_PSP_inf(file_wb,language)
+            finally:
+                file_wb.close()
+        else:
+            if action_fastRead.get():
+                print("Workbook has unsaved changes: reading it through Excel instead of the saved file")
+            get_PSP_risks_inf(wb,reco_tab,sm_tab,risk_tab,language)
+            project_inf=get_additional_PSP_inf(wb,language)
         
 
         if action_updateExcel.get():
-            update_excel_file(wb,reco_tab,sm_tab,risk_tab,language)
+            with excel_fast_mode(excel):
+                update_excel_file(wb,reco_tab,sm_tab,risk_tab,language)
  
     except Exception as e:
         print(e)
@@ -679,10 +1088,61 @@ def controller():
     
     #PowerPoint Manipulation
     if action_updatePPT.get():
-        update_ppt_file(reco_tab,sm_tab,risk_tab,project_inf,ppt_filename=ppt_filename.get(),language=language)
+        render_targets(parse_targets(ppt_filename.get(),language,folder=xl_folder),reco_tab,sm_tab,risk_tab,project_inf)
 
        
 
+"""
+Watch: Callback function called when user clicks on Watch.
+Start/stop regenerating outputs each time the excel file is saved
+"""
+def toggle_watch_button():
+    global watcher
+    global watch_poll_id
+    #Cancel the scheduled poll so stopping/restarting never leaves several polling loops
+    if watch_poll_id is not None:
+        root.after_cancel(watch_poll_id)
+        watch_poll_id=None
+    if watcher is not None:
+        watcher=None
+        watch_button.config(text="Watch")
+        return
+
+    try:
+        excel = win32com.client.gencache.EnsureDispatch('Excel.Application')
+        wb = openWorkbook(excel, excel_filename.get())
+        watcher=WorkbookWatcher(xl_fullname=wb.FullName,xl_name=wb.Name,
+            ppt_filename=ppt_filename.get(),language=language_button.config('text')[-1],
+            update_excel=action_updateExcel.get(),update_ppt=action_updatePPT.get())
+    except Exception as e:
+        print(e)
+        return
+    finally:
+        # RELEASES RESOURCES
+        wb = None
+        excel = None
+
+    watch_button.config(text="Stop watching")
+    #Schedule polling first so watch mode stays active even if the first run fails
+    watch_poll_id=root.after(watch_poll_ms,watch_poll)
+    #Generate outputs once so later runs only redo what changed
+    try:
+        watcher.run()
+    except Exception as e:
+        print(e)
+
+"""Periodic check of the watched excel file (scheduled in tkinter main loop)"""
+def watch_poll():
+    global watch_poll_id
+    watch_poll_id=None
+    if watcher is None:
+        return
+    try:
+        watcher.poll()
+    except Exception as e:
+        print(e)
+    watch_poll_id=root.after(watch_poll_ms,watch_poll)
+
 """Handle text switch on language button """
 def toggle_language_button():
     if language_button.config('text')[-1] == "FR":
@@ -715,7 +1175,7 @@ if __name__=="__main__":
     language_button.grid(column=0, row=0, sticky=tk.EW, padx=5, pady=5)
     #Filename titles
     tk.Label(root, text='excel filename (with extension):').grid(column=0, row=1, sticky=tk.EW, padx=5, pady=5)
-    tk.Label(root, text='ppt filename (with extension):').grid(column=0, row=2, sticky=tk.EW, padx=5, pady=5)
+    tk.Label(root, text='ppt filename(s) (with extension, ";" separated, optional =FR/=EN,full/exec):').grid(column=0, row=2, sticky=tk.EW, padx=5, pady=5)
 
     #Filename input box
     excel_filename = tk.Entry(root)
@@ -728,8 +1188,16 @@ if __name__=="__main__":
     tk.Checkbutton(root, text='Update excel document', variable=action_updateExcel).grid(row=3, column=0, sticky=tk.W, padx=15, pady=5)
     action_updatePPT = tk.BooleanVar()
     tk.Checkbutton(root, text='Update ppt document', variable=action_updatePPT).grid(row=4,column=0, sticky=tk.W, padx=15, pady=5)
+    action_fastRead = tk.BooleanVar()
+    tk.Checkbutton(root, text='Read saved excel file (faster, only if no unsaved changes: save after updating excel)', variable=action_fastRead).grid(row=5,column=0, sticky=tk.W, padx=15, pady=5)
 
     #RUN button
-    tk.Button(root, text ="Run", command = controller).grid(row=5, column=1, padx=15, pady=15,sticky=tk.EW)
+    tk.Button(root, text ="Run", command = controller).grid(row=6, column=1, padx=15, pady=15,sticky=tk.EW)
+
+    #WATCH button
+    watcher=None
+    watch_poll_id=None
+    watch_button=tk.Button(root, text ="Watch", command = toggle_watch_button)
+    watch_button.grid(row=6, column=0, padx=15, pady=15,sticky=tk.EW)
     
     root.mainloop()
\ No newline at end of file
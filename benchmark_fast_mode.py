@@ -0,0 +1,306 @@
+"""
+* Benchmark: effect of Office fast mode (excel_fast_mode / ppt_fast_mode) on the Excel and PowerPoint write phases
+* Runs update_excel_file and update_ppt_file against stand-in Excel/PowerPoint objects (no Office, no pywin32 needed).
+* Observed: number of writes, how many were made while repaint, automatic calculation, events or window redraw
+* were on, and whether settings are set during fast mode and restored afterwards, including on error.
+* Timings are a modelled estimate: observed writes multiplied by assumed per-write costs, not Office measurements.
+* Usage: python benchmark_fast_mode.py [nb_risks]
+"""
+
+#---------------------------
+#          imports
+#---------------------------
+import sys
+import types
+
+#Stand-in for pywin32: the benchmark must run without Office and never drive a real instance
+win32com=types.ModuleType("win32com")
+win32com.client=types.ModuleType("win32com.client")
+sys.modules["win32com"]=win32com
+sys.modules["win32com.client"]=win32com.client
+
+from SNOW_automation import (Risk,ProjectPSP,RenderTarget,add_elems_from_RXX,excel_fast_mode,ppt_fast_mode,
+    update_excel_file,update_ppt_file,render_targets,xl_calculation_manual,ppt_minimized)
+
+#---------------------------
+#          Variables
+#---------------------------
+#Assumed cost per write (seconds), only used for the modelled estimate
+repaint_cost=0.00005
+recalc_cost=0.0002
+event_cost=0.00002
+redraw_cost=0.0001
+duplicate_redraw_cost=0.01
+
+xl_calculation_automatic=-4105
+window_normal=1
+
+#Shapes of each slide of the stand-in ppt template (tables are the shapes with a number of rows)
+template_slides=[
+    {"NOMPROJET":None,"CPI":None},
+    {"Title Context":None,"PRJ NAME":None,"CONTEXT":2},
+    {"Title Classification":None,"Assumptions":None,"DICP":2,"RTO RPO":2},
+    {"Title ExecSum":None,"Summary":None,"Decision":None},
+    {"Title Risks":None,"Risks":6},
+    {"Title Risk":None,"Risk":2,"Recommendations":6,"SecurityMeasures":6},
+    {"Title Recommendations":None,"Recommendations":6},
+    {"Title SecurityMeasures":None,"SecurityMeasures":6}
+]
+
+#---------------------------
+#          Stand-in Excel object model
+#---------------------------
+
+'''
+* Class StandInExcel : Excel application settings used by excel_fast_mode, count writes made with each costly setting on
+'''
+class StandInExcel:
+    def __init__(self):
+        self.ScreenUpdating=True
+        self.Calculation=xl_calculation_automatic
+        self.EnableEvents=True
+        self.WindowState=window_normal
+        self.nb_writes=0
+        self.nb_repainted=0
+        self.nb_recalculated=0
+        self.nb_events=0
+
+    def charge(self):
+        self.nb_writes+=1
+        if self.ScreenUpdating:
+            self.nb_repainted+=1
+        if self.Calculation!=xl_calculation_manual:
+            self.nb_recalculated+=1
+        if self.EnableEvents:
+            self.nb_events+=1
+
+    def estimate(self):
+        return self.nb_repainted*repaint_cost+self.nb_recalculated*recalc_cost+self.nb_events*event_cost
+
+    def settings(self):
+        return (self.ScreenUpdating,self.Calculation,self.EnableEvents,self.WindowState)
+
+class StandInCell:
+    def __init__(self,sheet,row,column):
+        self.sheet=sheet
+        self.row=row
+        self.column=column
+
+    @property
+    def Value(self):
+        return self.sheet.values.get((self.row,self.column))
+
+    @Value.setter
+    def Value(self,value):
+        self.sheet.app.charge()
+        self.sheet.values[(self.row,self.column)]=value
+
+class StandInWorksheet:
+    def __init__(self,app):
+        self.app=app
+        self.values={}
+
+    def Cells(self,row,column):
+        return StandInCell(self,row,column)
+
+class StandInWorkbook:
+    def __init__(self,app):
+        self.app=app
+        self.sheets={}
+
+    def Worksheets(self,name):
+        if name not in self.sheets:
+            self.sheets[name]=StandInWorksheet(self.app)
+        return self.sheets[name]
+
+#---------------------------
+#          Stand-in PowerPoint object model
+#---------------------------
+
+'''
+* Class StandInPowerPoint : PowerPoint application used by update_ppt_file and ppt_fast_mode,
+* count writes and slide duplications made while the window is redrawn (not minimised)
+'''
+class StandInPowerPoint:
+    def __init__(self):
+        self.WindowState=window_normal
+        self.nb_writes=0
+        self.nb_redrawn=0
+        self.nb_duplicates=0
+        self.nb_duplicates_redrawn=0
+        self.presentation=StandInPresentation(self)
+
+    def Presentations(self,name):
+        return self.presentation
+
+    def charge(self):
+        self.nb_writes+=1
+        if self.WindowState!=ppt_minimized:
+            self.nb_redrawn+=1
+
+    def charge_duplicate(self):
+        self.nb_duplicates+=1
+        if self.WindowState!=ppt_minimized:
+            self.nb_duplicates_redrawn+=1
+
+    def estimate(self):
+        return self.nb_redrawn*redraw_cost+self.nb_duplicates_redrawn*duplicate_redraw_cost
+
+    def settings(self):
+        return (self.WindowState,)
+
+#Any object of a ppt shape (TextFrame, TextRange, Font, Fill, etc): writing an attribute is counted
+class StandInNode:
+    def __init__(self,app):
+        object.__setattr__(self,"app",app)
+
+    def __getattr__(self,name):
+        child=StandInNode(self.app)
+        object.__setattr__(self,name,child)
+        return child
+
+    def __setattr__(self,name,value):
+        self.app.charge()
+        object.__setattr__(self,name,value)
+
+class StandInRow:
+    def __init__(self,rows):
+        self.rows=rows
+        self.Cells=[StandInNode(rows.app) for column in range(7)]
+
+    def Delete(self):
+        self.rows.app.charge()
+        self.rows.Count-=1
+
+class StandInRows:
+    def __init__(self,app,count):
+        self.app=app
+        self.Count=count
+
+    def __call__(self,index):
+        return StandInRow(self)
+
+    def Add(self,index):
+        self.app.charge()
+        self.Count+=1
+
+class StandInTable:
+    def __init__(self,app,nb_rows):
+        self.app=app
+        self.Rows=StandInRows(app,nb_rows)
+        self.cells={}
+
+    def Cell(self,row,column):
+        if (row,column) not in self.cells:
+            self.cells[(row,column)]=StandInNode(self.app)
+        return self.cells[(row,column)]
+
+class StandInShape:
+    def __init__(self,app,nb_rows):
+        self.nb_rows=nb_rows
+        self.TextFrame=StandInNode(app)
+        #Text shapes are read before being written (placeholders replaced with re.sub)
+        object.__setattr__(self.TextFrame.TextRange,"Text","[Project name] <CPI> <Division>")
+        if nb_rows is not None:
+            self.Table=StandInTable(app,nb_rows)
+
+class StandInSlide:
+    def __init__(self,presentation,shapes):
+        self.presentation=presentation
+        self.shapes={name:StandInShape(presentation.app,nb_rows) for name,nb_rows in shapes.items()}
+
+    def Shapes(self,name):
+        #Like COM: unknown shape name raises, search_slide relies on it
+        return self.shapes[name]
+
+    def Duplicate(self):
+        self.presentation.app.charge_duplicate()
+        copy=StandInSlide(self.presentation,{name:shape.nb_rows for name,shape in self.shapes.items()})
+        self.presentation.Slides.insert(self.presentation.Slides.index(self)+1,copy)
+        return copy
+
+    def Delete(self):
+        self.presentation.app.charge()
+        self.presentation.Slides.remove(self)
+
+class StandInPresentation:
+    def __init__(self,app):
+        self.app=app
+        self.Slides=[]
+        self.Slides.extend(StandInSlide(self,shapes) for shapes in template_slides)
+
+#---------------------------
+#          Benchmark
+#---------------------------
+
+"""Build a PSP model of nb_risks risks, each with 3 recommendations and 3 security measures shared between risks"""
+def build_model(nb_risks):
+    risk_tab=[]
+    reco_tab=[]
+    sm_tab=[]
+    for i in range(nb_risks):
+        risk=Risk(f"R{i+1:02d}","Theme",f"Risk description {i}","2","3","High","1","2","Acceptable")
+        risk_tab.append(risk)
+        add_elems_from_RXX([(f"Recommendation {(i+k)%60}","High") for k in range(3)],risk,reco_tab,is_reco=True)
+        add_elems_from_RXX([(f"Security measure {(i+k)%60}",None) for k in range(3)],risk,sm_tab,is_reco=False)
+    project_inf=ProjectPSP(*["Value"]*13)
+    return reco_tab,sm_tab,risk_tab,project_inf
+
+"""Excel write phase (update_excel_file) on a fresh stand-in workbook, return the stand-in application"""
+def bench_excel(reco_tab,sm_tab,risk_tab,project_inf,fast):
+    app=StandInExcel()
+    wb=StandInWorkbook(app)
+    if fast:
+        with excel_fast_mode(app):
+            update_excel_file(wb,reco_tab,sm_tab,risk_tab,"EN")
+    else:
+        update_excel_file(wb,reco_tab,sm_tab,risk_tab,"EN")
+    return app
+
+"""PowerPoint write phase (update_ppt_file: clean, duplicate and fill slides) on a fresh stand-in deck, return the stand-in application"""
+def bench_ppt(reco_tab,sm_tab,risk_tab,project_inf,fast):
+    app=StandInPowerPoint()
+    win32com.client.GetActiveObject=lambda name: app
+    if fast:
+        render_targets([RenderTarget("deck.pptx","EN")],reco_tab,sm_tab,risk_tab,project_inf)
+    else:
+        update_ppt_file(reco_tab,sm_tab,risk_tab,project_inf,ppt_filename="deck.pptx",language="EN")
+    return app
+
+"""Check settings are changed inside the fast mode context and restored on exit, including when an error is raised"""
+def check_settings(app,fast_mode):
+    before=app.settings()
+    with fast_mode(app):
+        during=app.settings()
+    restored=app.settings()==before
+    try:
+        with fast_mode(app):
+            raise RuntimeError("write failed")
+    except RuntimeError:
+        pass
+    return before,during,restored,app.settings()==before
+
+if __name__=="__main__":
+    nb_risks=99
+    if len(sys.argv)>1:
+        nb_risks=int(sys.argv[1])
+    model=build_model(nb_risks)
+    print(f"{len(model[2])} risks, {len(model[0])} recommendations, {len(model[1])} security measures")
+
+    normal=bench_excel(*model,fast=False)
+    fast=bench_excel(*model,fast=True)
+    print(f"Excel: {normal.nb_writes} writes")
+    print(f"  without fast mode: {normal.nb_repainted} repainted, {normal.nb_recalculated} recalculated, {normal.nb_events} with events")
+    print(f"  with fast mode:    {fast.nb_repainted} repainted, {fast.nb_recalculated} recalculated, {fast.nb_events} with events")
+    print(f"  modelled estimate: {normal.estimate():.3f}s -> {fast.estimate():.3f}s")
+
+    normal=bench_ppt(*model,fast=False)
+    fast=bench_ppt(*model,fast=True)
+    print(f"PowerPoint: {normal.nb_writes} writes, {normal.nb_duplicates} slide duplications")
+    print(f"  without fast mode: {normal.nb_redrawn} writes and {normal.nb_duplicates_redrawn} duplications redrawn")
+    print(f"  with fast mode:    {fast.nb_redrawn} writes and {fast.nb_duplicates_redrawn} duplications redrawn")
+    print(f"  modelled estimate: {normal.estimate():.3f}s -> {fast.estimate():.3f}s")
+
+    for name,app,fast_mode in (("Excel",StandInExcel(),excel_fast_mode),("PowerPoint",StandInPowerPoint(),ppt_fast_mode)):
+        before,during,restored,restored_on_error=check_settings(app,fast_mode)
+        print(f"{name} settings: before {before}, during fast mode {during}, restored {restored}, restored on error {restored_on_error}")